@@ -63,7 +63,7 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "": ["*.md", "*.txt", "*.json"],
+        "": ["*.md", "*.txt", "*.json", "*.qss", "*.qrc"],
     },
     keywords=[
         "ai",
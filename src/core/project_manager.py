@@ -10,6 +10,7 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 import shutil
 import logging
+import torch
 
 from generators.story_engine import StoryEngine, StoryScene
 from generators.prompt_builder import PromptBuilder
@@ -42,7 +43,7 @@ class ProjectManager:
         self.story_engine = StoryEngine()
         self.prompt_builder = PromptBuilder()
         self.image_processor = ColoringBookProcessor()
-        self.pdf_generator = PDFGenerator()
+        self.pdf_generator = PDFGenerator(cache_dir=app_config.temp_dir / "pdf_cache")
         
         # Generation manager (initialized when needed)
         self.generation_manager = None
@@ -410,6 +411,13 @@ class ProjectManager:
         """Create FluxConfig from GPU selection"""
         from generators.flux_comfyui_generator import FluxConfig
         
+        # FP8 weight storage depends on the GPU and installed libraries
+        gpu_info = self.gpu_manager.get_gpu_by_id(gpu_config.get("device_id", 0))
+        if gpu_info is not None:
+            dtype, fp8_casting = self.gpu_manager.flux_precision(gpu_info, gpu_config)
+        else:
+            dtype, fp8_casting = torch.float16, False
+        
         return FluxConfig(
             model_path=gpu_config.get("model_path", "black-forest-labs/FLUX.1-schnell"),
             width=gpu_config.get("width", 512),
@@ -418,10 +426,12 @@ class ProjectManager:
             guidance_scale=gpu_config.get("guidance_scale", 0.0),
             seed=self.current_project['config'].get('generation_seed') if self.current_project else None,
             device=gpu_config.get("device", "cuda:0"),
-            dtype=torch.float16,
+            dtype=dtype,
             use_fp8=gpu_config.get("use_fp8", False),
+            fp8_layerwise_casting=fp8_casting,
             enable_cpu_offload=gpu_config.get("enable_cpu_offload", True),
-            enable_sequential_cpu_offload=gpu_config.get("enable_sequential_cpu_offload", True)
+            enable_sequential_cpu_offload=gpu_config.get("enable_sequential_cpu_offload", True),
+            compile_transformer=gpu_config.get("compile_transformer", False)
         )
     
     def regenerate_page(self, page_index: int, progress_callback=None) -> Path:
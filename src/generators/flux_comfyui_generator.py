@@ -37,6 +37,8 @@ class FluxConfig:
     device: str = "cuda"
     dtype: torch.dtype = torch.float16
     use_fp8: bool = False  # RTX 3070 doesn't support FP8
+    fp8_layerwise_casting: bool = False  # Store transformer weights in FP8, compute in dtype
+    compile_transformer: bool = False  # torch.compile the transformer; needs offloading disabled
     enable_cpu_offload: bool = True  # For 8GB VRAM
     enable_sequential_cpu_offload: bool = True  # More aggressive offloading
     # ComfyUI-style local models support
@@ -68,6 +70,7 @@ class FluxComfyUIGenerator:
     def _load_models(self):
         """Load FLUX models similar to ComfyUI approach"""
         self.logger.info("Loading FLUX models...")
+        self._configure_backends()
         
         # Try ComfyUI-style local models first if enabled
         if self.config.local_models_dir and self.config.prefer_local_models:
@@ -100,7 +103,8 @@ class FluxComfyUIGenerator:
             # Load all models
             (self.transformer, self.vae, self.text_encoder, self.tokenizer,
              self.text_encoder_2, self.tokenizer_2, _) = local_loader.load_all_models(
-                self.config.device, self.config.dtype
+                self.config.device, self.config.dtype,
+                prepare_transformer=self._apply_layerwise_casting
             )
             
             if self.transformer is None:
@@ -158,13 +162,16 @@ class FluxComfyUIGenerator:
             
             self.tokenizer_2 = T5TokenizerFast.from_pretrained(self.config.t5_path)
             
-            # Load FLUX transformer (flux1-dev.safetensors equivalent)
+            # Load FLUX transformer (flux1-dev.safetensors equivalent), casting
+            # its weights before they reach the GPU
             self.logger.info("Loading FLUX transformer...")
-            self.transformer = FluxTransformer2DModel.from_pretrained(
+            transformer = FluxTransformer2DModel.from_pretrained(
                 self.config.model_path,
                 subfolder="transformer",
                 torch_dtype=self.config.dtype
-            ).to(self.config.device)
+            )
+            self._apply_layerwise_casting(transformer)
+            self.transformer = transformer.to(self.config.device)
             
             # Setup scheduler
             self.scheduler = FlowMatchEulerDiscreteScheduler.from_pretrained(
@@ -192,7 +199,9 @@ class FluxComfyUIGenerator:
             self.pipeline = FluxPipeline.from_pretrained(
                 self.config.model_path,
                 torch_dtype=self.config.dtype
-            ).to(self.config.device)
+            )
+            self._apply_layerwise_casting(self.pipeline.transformer)
+            self.pipeline = self.pipeline.to(self.config.device)
             
             # Extract components
             self.transformer = self.pipeline.transformer
@@ -203,6 +212,8 @@ class FluxComfyUIGenerator:
             self.tokenizer_2 = self.pipeline.tokenizer_2
             self.scheduler = self.pipeline.scheduler
             
+            self._apply_compile()
+            
             self.logger.info("Unified pipeline loaded successfully")
             
         except Exception as e:
@@ -218,6 +229,8 @@ class FluxComfyUIGenerator:
             vram_gb = torch.cuda.get_device_properties(0).total_memory / (1024**3)
             self.logger.info(f"GPU: RTX 3070 - {vram_gb:.1f}GB VRAM, Compute {capability[0]}.{capability[1]}")
         
+        self._apply_compile()
+        
         # Enable CPU offloading for 8GB VRAM
         if self.config.enable_sequential_cpu_offload:
             try:
@@ -261,6 +274,53 @@ class FluxComfyUIGenerator:
         except:
             pass
     
+    def _configure_backends(self):
+        """Set process-wide CUDA math backends before any model is loaded"""
+        if not torch.cuda.is_available():
+            return
+        
+        # TF32 tensor cores for any fp32 matmuls, flash kernels for SDPA
+        torch.set_float32_matmul_precision('high')
+        torch.backends.cuda.enable_flash_sdp(True)
+    
+    def _apply_layerwise_casting(self, transformer):
+        """Store transformer weights in FP8 and upcast each layer for compute
+        
+        Called before the transformer is moved to the device, so the
+        full-precision weights never occupy VRAM.
+        """
+        if not self.config.fp8_layerwise_casting:
+            return
+        
+        # Text encoders stay in full precision; diffusers skips norm and
+        # embedding layers of the transformer by default
+        try:
+            transformer.enable_layerwise_casting(
+                storage_dtype=torch.float8_e4m3fn,
+                compute_dtype=self.config.dtype
+            )
+            self.logger.info("✅ FP8 layerwise casting enabled for transformer")
+        except Exception as e:
+            self.logger.warning(f"FP8 layerwise casting failed: {e}")
+    
+    def _apply_compile(self):
+        """Compile the transformer so the denoising loop runs fused kernels"""
+        if not self.config.compile_transformer:
+            return
+        
+        # Offload hooks move weights between devices every step and break the graph
+        if self.config.enable_cpu_offload or self.config.enable_sequential_cpu_offload:
+            self.logger.warning("torch.compile skipped - disable CPU offload to compile the transformer")
+            return
+        
+        try:
+            self.transformer = torch.compile(self.transformer, mode="reduce-overhead")
+            if hasattr(self, 'pipeline') and self.pipeline:
+                self.pipeline.transformer = self.transformer
+            self.logger.info("✅ torch.compile enabled for transformer (first generation compiles)")
+        except Exception as e:
+            self.logger.warning(f"torch.compile failed: {e}")
+    
     def _enable_component_offloading(self):
         """Enable component-level CPU offloading for RTX 3070"""
         components = [
@@ -81,7 +81,7 @@ class FluxLocalModelLoader:
         
         return availability
     
-    def load_flux_transformer(self, device: str, dtype: torch.dtype):
+    def load_flux_transformer(self, device: str, dtype: torch.dtype, prepare_transformer=None):
         """Load FLUX transformer from local safetensors"""
         
         flux_path = self.find_model_file('flux_model')
@@ -105,6 +105,10 @@ class FluxLocalModelLoader:
             
             # Load the local weights
             transformer.load_state_dict(state_dict, strict=False)
+            
+            # e.g. FP8 weight casting, applied while still on the CPU
+            if prepare_transformer is not None:
+                prepare_transformer(transformer)
             transformer = transformer.to(device)
             
             self.logger.info("✅ FLUX transformer loaded successfully")
@@ -176,7 +180,7 @@ class FluxLocalModelLoader:
         self.logger.info("✅ VAE loaded successfully")
         return vae
     
-    def load_all_models(self, device: str, dtype: torch.dtype):
+    def load_all_models(self, device: str, dtype: torch.dtype, prepare_transformer=None):
         """Load all FLUX models exactly like ComfyUI"""
         
         self.logger.info("Loading FLUX models (ComfyUI style)...")
@@ -192,7 +196,7 @@ class FluxLocalModelLoader:
         
         try:
             # Load exactly like your ComfyUI script
-            transformer = self.load_flux_transformer(device, dtype)
+            transformer = self.load_flux_transformer(device, dtype, prepare_transformer)
             
             text_encoder, tokenizer, text_encoder_2, tokenizer_2 = self.load_clip_encoders(device, dtype)
             
@@ -0,0 +1,36 @@
+"""
+Shared layout helpers for the wizard pages
+"""
+
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QSizePolicy, QSpacerItem
+from PySide6.QtGui import QFont
+
+PAGE_SPACING = 20
+PAGE_TITLE_POINT_SIZE = 20
+
+# Built on first use - QFont needs a running QApplication
+_title_font = None
+
+def _get_title_font() -> QFont:
+    """Get the shared page title font"""
+    global _title_font
+    if _title_font is None:
+        _title_font = QFont()
+        _title_font.setPointSize(PAGE_TITLE_POINT_SIZE)
+        _title_font.setBold(True)
+    return _title_font
+
+def make_titled_page(layout: QVBoxLayout, title_text: str) -> QLabel:
+    """Set up the standard page skeleton on layout and add the page title"""
+    layout.setSpacing(PAGE_SPACING)
+    
+    title = QLabel(title_text)
+    title.setFont(_get_title_font())
+    title.setObjectName("pageTitle")
+    layout.addWidget(title)
+    return title
+
+def add_trailing_spacer(layout: QVBoxLayout):
+    """Push the page content to the top"""
+    # Each layout takes ownership of its spacer item, so one is created per page
+    layout.addItem(QSpacerItem(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding))
@@ -184,15 +184,18 @@ class GPUSelectionWidget(QWidget):
         self.attention_slice_check = QCheckBox("Attention Slicing")
         self.vae_slice_check = QCheckBox("VAE Slicing")
         self.fp8_check = QCheckBox("FP8 Precision")
+        # torch.compile cannot trace through offload hooks
+        self.compile_check = QCheckBox("Compile Transformer (no offloading)")
         
         config_layout.addWidget(self.cpu_offload_check, 3, 0, 1, 2)
         config_layout.addWidget(self.attention_slice_check, 3, 2, 1, 2)
         config_layout.addWidget(self.vae_slice_check, 4, 0, 1, 2)
         config_layout.addWidget(self.fp8_check, 4, 2, 1, 2)
+        config_layout.addWidget(self.compile_check, 5, 0, 1, 4)
         
         # Apply recommended button
         self.apply_recommended_btn = QPushButton("🎯 Apply Recommended Settings")
-        config_layout.addWidget(self.apply_recommended_btn, 5, 0, 1, 4)
+        config_layout.addWidget(self.apply_recommended_btn, 6, 0, 1, 4)
         
         parent_layout.addWidget(config_group)
     
@@ -237,11 +240,15 @@ class GPUSelectionWidget(QWidget):
         self.guidance_spin.valueChanged.connect(self.on_config_changed)
         self.model_combo.currentTextChanged.connect(self.on_config_changed)
         
-        # Checkbox connections
+        # Checkbox connections; compiling needs offloading off, so that
+        # checkbox is updated before the config is re-emitted
+        self.cpu_offload_check.toggled.connect(
+            lambda offload: self.compile_check.setEnabled(not offload))
         self.cpu_offload_check.toggled.connect(self.on_config_changed)
         self.attention_slice_check.toggled.connect(self.on_config_changed)
         self.vae_slice_check.toggled.connect(self.on_config_changed)
         self.fp8_check.toggled.connect(self.on_config_changed)
+        self.compile_check.toggled.connect(self.on_config_changed)
     
     def refresh_gpu_list(self):
         """Refresh the list of available GPUs"""
@@ -476,6 +483,9 @@ class GPUSelectionWidget(QWidget):
             "enable_attention_slicing": self.attention_slice_check.isChecked(),
             "enable_vae_slicing": self.vae_slice_check.isChecked(),
             "use_fp8": self.fp8_check.isChecked(),
+            "compile_transformer": self.compile_check.isEnabled() and self.compile_check.isChecked(),
+            # Profile setting: FP8 weight storage with fp16 compute on RTX 3070/3080
+            "fp8_storage_manual_cast": self.selected_gpu.recommended_config.get("fp8_storage_manual_cast", False),
             "device": f"cuda:{self.selected_gpu.device_id}",
             "dtype": "float16"
         }
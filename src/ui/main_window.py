@@ -2,14 +2,26 @@
 Main application window
 """
 
-from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+import logging
+from pathlib import Path
+
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QStackedWidget, QPushButton, QLabel, QFrame)
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QFont, QPixmap
+from PySide6.QtCore import Qt, Signal, QFile, QIODevice
+from PySide6.QtGui import QFont, QPixmap, QFontMetrics
 
 from .wizard_pages import WelcomePage, ProjectSetupPage, ThemeSelectionPage, GenerationPage, ExportPage
 from core.app_config import AppConfig
 
+# Compiled Qt resource built with:
+#   pyside6-rcc src/ui/resources/resources.qrc -o src/ui/resources_rc.py
+# Falls back to reading the .qss straight from disk when it hasn't been built.
+try:
+    from . import resources_rc  # noqa: F401
+    STYLESHEET_PATH = ":/app.qss"
+except ImportError:
+    STYLESHEET_PATH = str(Path(__file__).parent / "resources" / "app.qss")
+
 class MainWindow(QMainWindow):
     """Main application window with wizard flow"""
     
@@ -22,9 +34,27 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1000, 700)
         self.resize(1200, 800)
         
+        self._load_stylesheet()
         self._setup_ui()
         self._setup_connections()
         
+    def _load_stylesheet(self):
+        """Load the application stylesheet once and apply it app-wide"""
+        stylesheet_file = QFile(STYLESHEET_PATH)
+        if not stylesheet_file.open(QIODevice.ReadOnly):
+            logging.getLogger(__name__).warning(f"Could not load stylesheet: {STYLESHEET_PATH}")
+            return
+        try:
+            QApplication.instance().setStyleSheet(bytes(stylesheet_file.readAll()).decode("utf-8"))
+        finally:
+            stylesheet_file.close()
+        
+    @staticmethod
+    def _use_styled_background(frame: QFrame):
+        """Let the stylesheet paint the frame background instead of palette fill + QSS"""
+        frame.setAttribute(Qt.WA_StyledBackground, True)
+        frame.setAutoFillBackground(False)
+        
     def _setup_ui(self):
         """Setup the user interface"""
         central_widget = QWidget()
@@ -40,7 +70,8 @@ class MainWindow(QMainWindow):
         
         # Content area
         content_frame = QFrame()
-        content_frame.setStyleSheet("QFrame { background-color: #f8f9fa; }")
+        content_frame.setObjectName("contentFrame")
+        self._use_styled_background(content_frame)
         main_layout.addWidget(content_frame)
         
         content_layout = QVBoxLayout(content_frame)
@@ -59,15 +90,8 @@ class MainWindow(QMainWindow):
     def _create_header(self, parent_layout):
         """Create application header"""
         header = QFrame()
-        header.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 0,
-                    stop: 0 #4a90e2, stop: 1 #357abd);
-                border: none;
-                min-height: 80px;
-                max-height: 80px;
-            }
-        """)
+        header.setObjectName("header")
+        self._use_styled_background(header)
         
         header_layout = QHBoxLayout(header)
         header_layout.setContentsMargins(20, 10, 20, 10)
@@ -78,7 +102,7 @@ class MainWindow(QMainWindow):
         title_font.setPointSize(18)
         title_font.setBold(True)
         title_label.setFont(title_font)
-        title_label.setStyleSheet("QLabel { color: white; }")
+        title_label.setObjectName("headerTitle")
         header_layout.addWidget(title_label)
         
         header_layout.addStretch()
@@ -88,7 +112,7 @@ class MainWindow(QMainWindow):
         brand_font = QFont()
         brand_font.setPointSize(10)
         brand_label.setFont(brand_font)
-        brand_label.setStyleSheet("QLabel { color: rgba(255, 255, 255, 0.8); }")
+        brand_label.setObjectName("headerBrand")
         header_layout.addWidget(brand_label)
         
         parent_layout.addWidget(header)
@@ -114,14 +138,8 @@ class MainWindow(QMainWindow):
     def _create_navigation_bar(self, parent_layout):
         """Create navigation bar with next/previous buttons"""
         nav_frame = QFrame()
-        nav_frame.setStyleSheet("""
-            QFrame {
-                background-color: #ffffff;
-                border-top: 1px solid #dee2e6;
-                min-height: 60px;
-                max-height: 60px;
-            }
-        """)
+        nav_frame.setObjectName("navFrame")
+        self._use_styled_background(nav_frame)
         
         nav_layout = QHBoxLayout(nav_frame)
         nav_layout.setContentsMargins(20, 10, 20, 10)
@@ -130,14 +148,21 @@ class MainWindow(QMainWindow):
         self.prev_button = QPushButton("← Previous")
         self.prev_button.setMinimumWidth(120)
         self.prev_button.setEnabled(False)
-        self.prev_button.setStyleSheet(self._get_button_style())
+        self.prev_button.setObjectName("prevButton")
         nav_layout.addWidget(self.prev_button)
         
         nav_layout.addStretch()
         
-        # Page indicator
-        self.page_indicator = QLabel("Step 1 of 5")
-        self.page_indicator.setStyleSheet("QLabel { color: #6c757d; font-weight: bold; }")
+        # Page indicator - every label string is known up front, and a fixed
+        # width keeps the nav bar from re-laying out when the text changes
+        total_pages = self.wizard_stack.count()
+        self._indicator_strings = tuple(f"Step {i + 1} of {total_pages}" for i in range(total_pages))
+        self.page_indicator = QLabel(self._indicator_strings[0])
+        self.page_indicator.setObjectName("pageIndicator")
+        self.page_indicator.setAlignment(Qt.AlignCenter)
+        indicator_font = self.page_indicator.font()
+        indicator_font.setBold(True)
+        self.page_indicator.setFixedWidth(QFontMetrics(indicator_font).horizontalAdvance("Step 99 of 99"))
         nav_layout.addWidget(self.page_indicator)
         
         nav_layout.addStretch()
@@ -145,55 +170,11 @@ class MainWindow(QMainWindow):
         # Next button
         self.next_button = QPushButton("Next →")
         self.next_button.setMinimumWidth(120)
-        self.next_button.setStyleSheet(self._get_button_style(primary=True))
+        self.next_button.setObjectName("nextButton")
         nav_layout.addWidget(self.next_button)
         
         parent_layout.addWidget(nav_frame)
         
-    def _get_button_style(self, primary=False):
-        """Get button stylesheet"""
-        if primary:
-            return """
-                QPushButton {
-                    background-color: #007bff;
-                    color: white;
-                    border: none;
-                    padding: 10px 20px;
-                    border-radius: 5px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #0056b3;
-                }
-                QPushButton:pressed {
-                    background-color: #004085;
-                }
-                QPushButton:disabled {
-                    background-color: #6c757d;
-                }
-            """
-        else:
-            return """
-                QPushButton {
-                    background-color: #6c757d;
-                    color: white;
-                    border: none;
-                    padding: 10px 20px;
-                    border-radius: 5px;
-                    font-weight: bold;
-                }
-                QPushButton:hover {
-                    background-color: #545b62;
-                }
-                QPushButton:pressed {
-                    background-color: #3d4144;
-                }
-                QPushButton:disabled {
-                    background-color: #e9ecef;
-                    color: #6c757d;
-                }
-            """
-    
     def _setup_connections(self):
         """Setup signal connections"""
         self.next_button.clicked.connect(self._next_page)
@@ -232,7 +213,7 @@ class MainWindow(QMainWindow):
         self.next_button.setEnabled(current_index < total_pages - 1)
         
         # Update page indicator
-        self.page_indicator.setText(f"Step {current_index + 1} of {total_pages}")
+        self.page_indicator.setText(self._indicator_strings[current_index])
         
         # Update next button text for last page
         if current_index == total_pages - 1:
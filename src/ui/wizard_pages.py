@@ -11,6 +11,7 @@ from PySide6.QtCore import Qt, Signal, QThread
 from PySide6.QtGui import QFont, QPixmap
 
 from core.app_config import AppConfig
+from ._page_utils import make_titled_page, add_trailing_spacer
 
 class BasePage(QWidget):
     """Base class for wizard pages"""
@@ -33,6 +34,22 @@ class BasePage(QWidget):
     def get_data(self) -> dict:
         """Get page data - override in subclasses"""
         return {}
+    
+    def _create_scrollable_layout(self) -> QVBoxLayout:
+        """Wrap the page content in a scroll area and return the content layout"""
+        outer_layout = QVBoxLayout(self)
+        outer_layout.setContentsMargins(0, 0, 0, 0)
+        
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QFrame.NoFrame)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        outer_layout.addWidget(scroll)
+        
+        container = QWidget()
+        scroll.setWidget(container)
+        return QVBoxLayout(container)
 
 class WelcomePage(BasePage):
     """Welcome page with app introduction"""
@@ -49,7 +66,7 @@ class WelcomePage(BasePage):
         title_font.setBold(True)
         title.setFont(title_font)
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet("QLabel { color: #2c3e50; margin: 20px; }")
+        title.setObjectName("welcomeTitle")
         layout.addWidget(title)
         
         # Description
@@ -64,35 +81,14 @@ class WelcomePage(BasePage):
         • Multiple export formats (PNG, PDF)
         """)
         description.setAlignment(Qt.AlignCenter)
-        description.setStyleSheet("""
-            QLabel { 
-                color: #34495e; 
-                font-size: 14px; 
-                line-height: 1.6;
-                margin: 20px;
-                max-width: 500px;
-            }
-        """)
+        description.setObjectName("welcomeDescription")
         description.setWordWrap(True)
         layout.addWidget(description)
         
         # Start button
         start_button = QPushButton("Get Started")
         start_button.setMinimumSize(200, 50)
-        start_button.setStyleSheet("""
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                padding: 15px 30px;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-        """)
+        start_button.setObjectName("startButton")
         start_button.clicked.connect(self.next_requested.emit)
         
         button_layout = QHBoxLayout()
@@ -105,33 +101,12 @@ class ProjectSetupPage(BasePage):
     """Project setup page for basic book configuration"""
     
     def _setup_ui(self):
-        layout = QVBoxLayout(self)
-        layout.setSpacing(20)
-        
-        # Page title
-        title = QLabel("Project Setup")
-        title_font = QFont()
-        title_font.setPointSize(20)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("QLabel { color: #2c3e50; margin-bottom: 10px; }")
-        layout.addWidget(title)
+        layout = self._create_scrollable_layout()
+        make_titled_page(layout, "Project Setup")
         
         # Book details group
         book_group = QGroupBox("Book Details")
-        book_group.setStyleSheet("""
-            QGroupBox {
-                font-weight: bold;
-                font-size: 14px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 10px 0 10px;
-            }
-        """)
+        book_group.setObjectName("bookGroup")
         book_layout = QVBoxLayout(book_group)
         
         # Title
@@ -193,38 +168,43 @@ class ProjectSetupPage(BasePage):
         
         layout.addWidget(char_group)
         
-        layout.addStretch()
-        
-    def validate(self) -> bool:
-        """Validate page input"""
-        return (len(self.title_input.text().strip()) > 0 and 
-                len(self.char_name_input.text().strip()) > 0)
-    
-    def get_data(self) -> dict:
-        """Get page data"""
-        return {
+        add_trailing_spacer(layout)
+        
+        # Keep a normalised copy of the inputs so validate/get_data don't
+        # have to read and strip every field again
+        self._data_cache = {}
+        self._snapshot()
+        self.title_input.textChanged.connect(self._snapshot)
+        self.age_combo.currentTextChanged.connect(self._snapshot)
+        self.pages_spin.valueChanged.connect(self._snapshot)
+        self.char_name_input.textChanged.connect(self._snapshot)
+        self.char_desc_input.textChanged.connect(self._snapshot)
+        
+    def _snapshot(self, *args) -> dict:
+        """Read each field once and cache the normalised values"""
+        self._data_cache = {
             'title': self.title_input.text().strip(),
             'age_range': self.age_combo.currentText(),
             'page_count': self.pages_spin.value(),
             'character_name': self.char_name_input.text().strip(),
             'character_description': self.char_desc_input.toPlainText().strip()
         }
+        return self._data_cache
+        
+    def validate(self) -> bool:
+        """Validate page input"""
+        return bool(self._data_cache['title']) and bool(self._data_cache['character_name'])
+    
+    def get_data(self) -> dict:
+        """Get page data"""
+        return dict(self._data_cache)
 
 class ThemeSelectionPage(BasePage):
     """Theme selection page"""
     
     def _setup_ui(self):
-        layout = QVBoxLayout(self)
-        layout.setSpacing(20)
-        
-        # Page title
-        title = QLabel("Choose Theme & Story")
-        title_font = QFont()
-        title_font.setPointSize(20)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("QLabel { color: #2c3e50; margin-bottom: 10px; }")
-        layout.addWidget(title)
+        layout = self._create_scrollable_layout()
+        make_titled_page(layout, "Choose Theme & Story")
         
         # Theme selection
         theme_group = QGroupBox("Story Theme")
@@ -241,13 +221,16 @@ class ThemeSelectionPage(BasePage):
             ("Custom Story", "I'll provide my own story outline")
         ]
         
+        # Add every radio before picking the default so the group doesn't
+        # emit toggles while siblings are still being added
+        self.theme_buttons.setExclusive(False)
         for i, (theme_name, description) in enumerate(themes):
             radio = QRadioButton(f"{theme_name}: {description}")
-            radio.setStyleSheet("QRadioButton { font-size: 13px; padding: 8px; }")
-            if i == 0:  # Default selection
-                radio.setChecked(True)
+            radio.setObjectName("themeOption")
             self.theme_buttons.addButton(radio, i)
             theme_layout.addWidget(radio)
+        self.theme_buttons.button(0).setChecked(True)  # Default selection
+        self.theme_buttons.setExclusive(True)
         
         layout.addWidget(theme_group)
         
@@ -265,16 +248,13 @@ class ThemeSelectionPage(BasePage):
         layout.addWidget(self.custom_story_group)
         
         # Connect theme selection to show/hide custom input
-        self.theme_buttons.buttonToggled.connect(self._on_theme_changed)
+        self.theme_buttons.idClicked.connect(self._on_theme_changed)
         
-        layout.addStretch()
+        add_trailing_spacer(layout)
     
-    def _on_theme_changed(self, button, checked):
+    def _on_theme_changed(self, button_id: int):
         """Handle theme selection change"""
-        if checked and self.theme_buttons.id(button) == 5:  # Custom story
-            self.custom_story_group.setVisible(True)
-        else:
-            self.custom_story_group.setVisible(False)
+        self.custom_story_group.setVisible(button_id == 5)  # Custom story
     
     def get_data(self) -> dict:
         """Get page data"""
@@ -295,16 +275,7 @@ class GenerationPage(BasePage):
     
     def _setup_ui(self):
         layout = QVBoxLayout(self)
-        layout.setSpacing(20)
-        
-        # Page title
-        title = QLabel("Generate & Preview")
-        title_font = QFont()
-        title_font.setPointSize(20)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("QLabel { color: #2c3e50; margin-bottom: 10px; }")
-        layout.addWidget(title)
+        make_titled_page(layout, "Generate & Preview")
         
         # GPU Selection Section
         from ui.gpu_selection_widget import GPUSelectionWidget
@@ -316,17 +287,7 @@ class GenerationPage(BasePage):
         controls_layout = QHBoxLayout()
         
         self.generate_button = QPushButton("Generate All Pages")
-        self.generate_button.setStyleSheet("""
-            QPushButton {
-                background-color: #27ae60;
-                color: white;
-                border: none;
-                padding: 12px 24px;
-                border-radius: 6px;
-                font-weight: bold;
-            }
-            QPushButton:hover { background-color: #219a52; }
-        """)
+        self.generate_button.setObjectName("generateButton")
         controls_layout.addWidget(self.generate_button)
         
         self.progress_bar = QProgressBar()
@@ -361,14 +322,7 @@ class GenerationPage(BasePage):
         self.preview_label = QLabel("Click 'Generate All Pages' to start...")
         self.preview_label.setAlignment(Qt.AlignCenter)
         self.preview_label.setMinimumSize(400, 500)
-        self.preview_label.setStyleSheet("""
-            QLabel {
-                border: 2px dashed #bdc3c7;
-                background-color: #ecf0f1;
-                color: #7f8c8d;
-                font-size: 16px;
-            }
-        """)
+        self.preview_label.setObjectName("previewLabel")
         scroll.setWidget(self.preview_label)
         scroll.setWidgetResizable(True)
         preview_layout.addWidget(scroll)
@@ -435,16 +389,7 @@ class ExportPage(BasePage):
     
     def _setup_ui(self):
         layout = QVBoxLayout(self)
-        layout.setSpacing(20)
-        
-        # Page title
-        title = QLabel("Export Your Coloring Book")
-        title_font = QFont()
-        title_font.setPointSize(20)
-        title_font.setBold(True)
-        title.setFont(title_font)
-        title.setStyleSheet("QLabel { color: #2c3e50; margin-bottom: 10px; }")
-        layout.addWidget(title)
+        make_titled_page(layout, "Export Your Coloring Book")
         
         # Export options
         options_group = QGroupBox("Export Options")
@@ -474,18 +419,7 @@ class ExportPage(BasePage):
         export_layout = QHBoxLayout()
         self.export_button = QPushButton("Export Coloring Book")
         self.export_button.setMinimumSize(200, 50)
-        self.export_button.setStyleSheet("""
-            QPushButton {
-                background-color: #e74c3c;
-                color: white;
-                border: none;
-                padding: 15px 30px;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QPushButton:hover { background-color: #c0392b; }
-        """)
+        self.export_button.setObjectName("exportButton")
         export_layout.addWidget(self.export_button)
         export_layout.addStretch()
         layout.addLayout(export_layout)
@@ -498,10 +432,10 @@ class ExportPage(BasePage):
         # Results area
         self.results_label = QLabel("")
         self.results_label.setWordWrap(True)
-        self.results_label.setStyleSheet("QLabel { color: #27ae60; font-weight: bold; }")
+        self.results_label.setObjectName("resultsLabel")
         layout.addWidget(self.results_label)
         
-        layout.addStretch()
+        add_trailing_spacer(layout)
         
     def get_data(self) -> dict:
         """Get export settings"""
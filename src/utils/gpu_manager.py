@@ -3,12 +3,18 @@ GPU Detection and Management System
 Handles multi-GPU environments and optimal configuration selection
 """
 
+import sys
 import torch
 import logging
-from typing import List, Dict, Optional, Tuple
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+# dataclass(slots=True) needs Python 3.10+; older versions keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class GPUType(Enum):
     """GPU type classifications for optimization"""
     RTX_3070 = "rtx_3070"
@@ -24,7 +30,32 @@ class GPUType(Enum):
     OTHER_24GB = "other_24gb"
     UNKNOWN = "unknown"
 
-@dataclass
+# FP8 (E4M3) weight storage is supported from Ada Lovelace (SM 8.9) onwards
+FP8_MIN_COMPUTE_CAPABILITY = (8, 9)
+# Older GPUs can still store FP8 weights and upcast them to fp16 per layer
+FP8_MANUAL_CAST_MIN_COMPUTE_CAPABILITY = (7, 0)
+
+def _layerwise_casting_supported() -> bool:
+    """Whether the installed torch and diffusers can store weights in FP8"""
+    try:
+        from diffusers import ModelMixin
+    except ImportError:
+        return False
+    return hasattr(torch, "float8_e4m3fn") and hasattr(ModelMixin, "enable_layerwise_casting")
+
+def _compute_gpu_score(compute_cap: Tuple[int, int], memory_gb: float) -> float:
+    """Rank a GPU by memory, with a bonus for newer architectures"""
+    base_score = memory_gb
+    # Bonus for newer compute capabilities
+    if compute_cap[0] >= 9:  # RTX 50 series
+        base_score += 10
+    elif compute_cap[0] >= 8 and compute_cap[1] >= 9:  # RTX 40 series
+        base_score += 5
+    elif compute_cap[0] >= 8 and compute_cap[1] >= 6:  # RTX 30 series
+        base_score += 2
+    return base_score
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class GPUInfo:
     """Information about a detected GPU"""
     device_id: int
@@ -34,8 +65,10 @@ class GPUInfo:
     gpu_type: GPUType
     recommended_config: Dict
     is_available: bool = True
+    props: Any = None  # cached torch.cuda device properties
+    score: float = 0.0  # ranking used by get_recommended_gpu
 
-@dataclass 
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class OptimizationProfile:
     """Optimization profile for specific GPU types"""
     name: str
@@ -51,14 +84,47 @@ class OptimizationProfile:
     memory_fraction: float
     batch_size: int
     model_variant: str  # schnell or dev
+    fp8_storage_manual_cast: bool = False  # FP8 weights upcast to fp16 on pre-Ada GPUs
+
+@lru_cache(maxsize=None)
+def _profile_config(profile: OptimizationProfile) -> Dict:
+    """Configuration dictionary for a (frozen, hashable) optimization profile"""
+    return {
+        "width": profile.width,
+        "height": profile.height,
+        "num_inference_steps": profile.steps,
+        "guidance_scale": profile.guidance_scale,
+        "enable_cpu_offload": profile.enable_cpu_offload,
+        "enable_sequential_cpu_offload": profile.enable_sequential_offload,
+        "enable_attention_slicing": profile.enable_attention_slicing,
+        "enable_vae_slicing": profile.enable_vae_slicing,
+        "use_fp8": profile.use_fp8,
+        "fp8_storage_manual_cast": profile.fp8_storage_manual_cast,
+        "memory_fraction": profile.memory_fraction,
+        "batch_size": profile.batch_size,
+        "model_variant": profile.model_variant,
+        "model_path": f"black-forest-labs/FLUX.1-{profile.model_variant}"
+    }
 
 class GPUManager:
     """Manages GPU detection, selection, and optimization profiles"""
     
+    # Model number substrings checked in order by _classify_gpu
+    _NAME_TABLE = (
+        ("5090", GPUType.RTX_5090),
+        ("4090", GPUType.RTX_4090),
+        ("4080", GPUType.RTX_4080),
+        ("4070", GPUType.RTX_4070),
+        ("3090", GPUType.RTX_3090),
+        ("3080", GPUType.RTX_3080),
+        ("3070", GPUType.RTX_3070),
+    )
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.available_gpus: List[GPUInfo] = []
         self.optimization_profiles: Dict[GPUType, OptimizationProfile] = {}
+        self._bench_pools: Dict[int, Any] = {}
         self._setup_optimization_profiles()
         self._detect_gpus()
     
@@ -79,7 +145,8 @@ class GPUManager:
             use_fp8=False,
             memory_fraction=0.85,
             batch_size=1,
-            model_variant="schnell"
+            model_variant="schnell",
+            fp8_storage_manual_cast=True
         )
         
         # RTX 3080 (10GB) - Balanced
@@ -96,7 +163,8 @@ class GPUManager:
             use_fp8=False,
             memory_fraction=0.9,
             batch_size=1,
-            model_variant="schnell"
+            model_variant="schnell",
+            fp8_storage_manual_cast=True
         )
         
         # RTX 3090 (24GB) - High memory
@@ -144,7 +212,7 @@ class GPUManager:
             enable_sequential_offload=False,
             enable_attention_slicing=False,
             enable_vae_slicing=False,
-            use_fp8=False,
+            use_fp8=True,
             memory_fraction=0.9,
             batch_size=2,
             model_variant="dev"
@@ -161,7 +229,7 @@ class GPUManager:
             enable_sequential_offload=False,
             enable_attention_slicing=False,
             enable_vae_slicing=False,
-            use_fp8=False,
+            use_fp8=True,
             memory_fraction=0.95,
             batch_size=4,
             model_variant="dev"
@@ -222,7 +290,9 @@ class GPUManager:
                     compute_capability=compute_cap,
                     gpu_type=gpu_type,
                     recommended_config=self._profile_to_config(profile),
-                    is_available=True
+                    is_available=True,
+                    props=props,
+                    score=_compute_gpu_score(compute_cap, memory_gb)
                 )
                 
                 self.available_gpus.append(gpu_info)
@@ -237,28 +307,13 @@ class GPUManager:
         
         name_lower = name.lower()
         
-        # RTX 30 series
-        if "3070" in name_lower:
-            return GPUType.RTX_3070
-        elif "3080" in name_lower:
-            return GPUType.RTX_3080  
-        elif "3090" in name_lower:
-            return GPUType.RTX_3090
-        
-        # RTX 40 series
-        elif "4070" in name_lower:
-            return GPUType.RTX_4070
-        elif "4080" in name_lower:
-            return GPUType.RTX_4080
-        elif "4090" in name_lower:
-            return GPUType.RTX_4090
-        
-        # RTX 50 series
-        elif "5090" in name_lower:
-            return GPUType.RTX_5090
+        # Known RTX models, newest first
+        for model_number, gpu_type in self._NAME_TABLE:
+            if model_number in name_lower:
+                return gpu_type
         
         # Generic classification by memory
-        elif memory_gb >= 30:
+        if memory_gb >= 30:
             return GPUType.OTHER_24GB
         elif memory_gb >= 20:
             return GPUType.OTHER_24GB
@@ -273,21 +328,8 @@ class GPUManager:
     
     def _profile_to_config(self, profile: OptimizationProfile) -> Dict:
         """Convert optimization profile to configuration dictionary"""
-        return {
-            "width": profile.width,
-            "height": profile.height,
-            "num_inference_steps": profile.steps,
-            "guidance_scale": profile.guidance_scale,
-            "enable_cpu_offload": profile.enable_cpu_offload,
-            "enable_sequential_cpu_offload": profile.enable_sequential_offload,
-            "enable_attention_slicing": profile.enable_attention_slicing,
-            "enable_vae_slicing": profile.enable_vae_slicing,
-            "use_fp8": profile.use_fp8,
-            "memory_fraction": profile.memory_fraction,
-            "batch_size": profile.batch_size,
-            "model_variant": profile.model_variant,
-            "model_path": f"black-forest-labs/FLUX.1-{profile.model_variant}"
-        }
+        # Built once per profile; callers get their own shallow copy
+        return dict(_profile_config(profile))
     
     def get_available_gpus(self) -> List[GPUInfo]:
         """Get list of all available GPUs"""
@@ -302,33 +344,37 @@ class GPUManager:
     
     def get_recommended_gpu(self) -> Optional[GPUInfo]:
         """Get the recommended GPU (highest memory, best performance)"""
-        if not self.available_gpus:
-            return None
-        
-        # Sort by memory (descending) and prefer newer architectures
-        def gpu_score(gpu: GPUInfo) -> float:
-            base_score = gpu.memory_gb
-            # Bonus for newer compute capabilities
-            if gpu.compute_capability[0] >= 9:  # RTX 50 series
-                base_score += 10
-            elif gpu.compute_capability[0] >= 8 and gpu.compute_capability[1] >= 9:  # RTX 40 series
-                base_score += 5
-            elif gpu.compute_capability[0] >= 8 and gpu.compute_capability[1] >= 6:  # RTX 30 series
-                base_score += 2
-            return base_score
-        
-        return max(self.available_gpus, key=gpu_score)
+        # Scores are computed once at detection time
+        return max(self.available_gpus, key=lambda gpu: gpu.score, default=None)
     
     def get_optimization_profile(self, gpu_type: GPUType) -> OptimizationProfile:
         """Get optimization profile for GPU type"""
         return self.optimization_profiles.get(gpu_type, 
             self.optimization_profiles[GPUType.OTHER_8GB])
     
+    def flux_precision(self, gpu_info: GPUInfo, config_dict: Dict) -> Tuple[torch.dtype, bool]:
+        """Compute dtype and FP8 layerwise casting flag for FLUX on a GPU"""
+        capability = tuple(gpu_info.compute_capability)
+        if not _layerwise_casting_supported():
+            return torch.float16, False
+        
+        # Ada and newer can hold transformer weights in FP8 and upcast per layer
+        if config_dict.get("use_fp8", False) and capability >= FP8_MIN_COMPUTE_CAPABILITY:
+            return torch.bfloat16, True
+        
+        # Older cards upcast FP8 weights to fp16 by hand. The transformer is
+        # still ~12GB in FP8 and T5-XXL comes on top, so the profile's CPU
+        # offloading stays as it is
+        manual_cast = (config_dict.get("fp8_storage_manual_cast", False) and
+                       capability >= FP8_MANUAL_CAST_MIN_COMPUTE_CAPABILITY)
+        return torch.float16, manual_cast
+    
     def create_flux_config(self, gpu_info: GPUInfo):
         """Create FLUX configuration for specific GPU"""
         from generators.flux_comfyui_generator import FluxConfig
         
         config_dict = gpu_info.recommended_config
+        dtype, fp8_casting = self.flux_precision(gpu_info, config_dict)
         
         return FluxConfig(
             model_path=config_dict["model_path"],
@@ -337,12 +383,25 @@ class GPUManager:
             num_inference_steps=config_dict["num_inference_steps"],
             guidance_scale=config_dict["guidance_scale"],
             device=f"cuda:{gpu_info.device_id}",
-            dtype=torch.float16,
+            dtype=dtype,
             use_fp8=config_dict["use_fp8"],
+            fp8_layerwise_casting=fp8_casting,
             enable_cpu_offload=config_dict["enable_cpu_offload"],
             enable_sequential_cpu_offload=config_dict["enable_sequential_cpu_offload"]
         )
     
+    def _get_bench_pool(self, device_id: int):
+        """Get the memory pool reused across benchmark runs on a device"""
+        if not hasattr(torch.cuda, "MemPool"):
+            return None
+        
+        pool = self._bench_pools.get(device_id)
+        if pool is None:
+            with torch.cuda.device(device_id):
+                pool = torch.cuda.MemPool()
+            self._bench_pools[device_id] = pool
+        return pool
+    
     def benchmark_gpu(self, gpu_info: GPUInfo) -> Dict[str, float]:
         """Run a quick benchmark on specific GPU"""
         try:
@@ -352,26 +411,31 @@ class GPUManager:
             start_time = torch.cuda.Event(enable_timing=True)
             end_time = torch.cuda.Event(enable_timing=True)
             
+            # Allocations come from a pool kept across runs, so the timed
+            # region does not pay for fresh cudaMalloc calls
+            pool = self._get_bench_pool(gpu_info.device_id)
+            pool_context = torch.cuda.use_mem_pool(pool, device) if pool is not None else nullcontext()
+            
             # Memory test
             with torch.cuda.device(device):
-                torch.cuda.empty_cache()
-                
-                start_time.record()
-                # Allocate and compute
-                x = torch.randn(1024, 1024, device=device, dtype=torch.float16)
-                y = torch.mm(x, x.T)
-                result = torch.sum(y)
-                end_time.record()
-                
-                torch.cuda.synchronize()
-                compute_time = start_time.elapsed_time(end_time)
+                torch.cuda.reset_peak_memory_stats(device)
                 
-                # Memory stats
-                allocated = torch.cuda.memory_allocated(device) / (1024**3)
-                cached = torch.cuda.memory_reserved(device) / (1024**3)
-                
-                del x, y, result
-                torch.cuda.empty_cache()
+                with pool_context:
+                    start_time.record()
+                    # Allocate and compute
+                    x = torch.randn(1024, 1024, device=device, dtype=torch.float16)
+                    y = torch.mm(x, x.T)
+                    result = torch.sum(y)
+                    end_time.record()
+                    
+                    torch.cuda.synchronize()
+                    compute_time = start_time.elapsed_time(end_time)
+                    
+                    # Memory stats
+                    allocated = torch.cuda.memory_allocated(device) / (1024**3)
+                    cached = torch.cuda.memory_reserved(device) / (1024**3)
+                    
+                    del x, y, result
             
             return {
                 "compute_time_ms": compute_time,
@@ -389,11 +453,20 @@ class GPUManager:
         """Get current memory usage for specific GPU"""
         try:
             device = f"cuda:{device_id}"
+            gpu_info = self.get_gpu_by_id(device_id)
+            if gpu_info is not None:
+                total_gb = gpu_info.memory_gb
+            else:
+                total_gb = torch.cuda.get_device_properties(device).total_memory / (1024**3)
+            
+            # One allocator snapshot instead of a query per counter; it is
+            # empty until the device has allocated anything
+            stats = torch.cuda.memory_stats(device)
             return {
-                "allocated_gb": torch.cuda.memory_allocated(device) / (1024**3),
-                "reserved_gb": torch.cuda.memory_reserved(device) / (1024**3),
-                "max_allocated_gb": torch.cuda.max_memory_allocated(device) / (1024**3),
-                "total_gb": torch.cuda.get_device_properties(device).total_memory / (1024**3)
+                "allocated_gb": stats.get("allocated_bytes.all.current", 0) / (1024**3),
+                "reserved_gb": stats.get("reserved_bytes.all.current", 0) / (1024**3),
+                "max_allocated_gb": stats.get("allocated_bytes.all.peak", 0) / (1024**3),
+                "total_gb": total_gb
             }
         except Exception as e:
             return {"error": str(e)}
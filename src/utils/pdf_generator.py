@@ -3,24 +3,191 @@ PDF generation utilities for coloring book export
 """
 
 from reportlab.lib.pagesizes import A4, letter
-from reportlab.platypus import SimpleDocTemplate, Image as ReportLabImage, Spacer, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm, inch
-from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab import rl_config
 from PIL import Image
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple, Union
+import hashlib
+import json
 import logging
+import math
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+_COVER_RE = re.compile(r'cover', re.IGNORECASE)
+# Compression profile -> zlib level for page streams and re-encoded images;
+# 'fast' suits local print shops, 'small' web distribution
+COMPRESSION_PROFILES = {'fast': 1, 'balanced': 6, 'small': 9}
+CROP_MARKS_FORM = 'CropMarks'
+# Bump when drawing changes so earlier cached PDFs are not reused
+PDF_CACHE_VERSION = 'v1'
+# Cached PDFs older than this, or beyond the size cap (oldest first), are evicted
+PDF_CACHE_MAX_AGE_DAYS = 30
+PDF_CACHE_MAX_BYTES = 512 * 1024 * 1024
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# PNG color type -> (PDF color space, components, allowed bit depths)
+_PNG_COLOR_TYPES = {0: ('DeviceGray', 1, (1, 8)), 2: ('DeviceRGB', 3, (8,))}
+
+class _PNGImageXObject(pdfdoc.PDFImageXObject):
+    """Image XObject embedding a PNG's compressed IDAT data as-is"""
+    
+    def __init__(self, name: str, width: int, height: int, color_space: str,
+                 colors: int, idat: bytes, bits: int = 8):
+        super().__init__(name)
+        self.width = width
+        self.height = height
+        self.bitsPerComponent = bits
+        self.colorSpace = color_space
+        self.colors = colors
+        self.streamContent = idat
+        self._filters = ('FlateDecode',)
+        self.mask = None
+    
+    def format(self, document):
+        # PNG rows carry per-row filter bytes, undone by the PNG predictor.
+        # An explicit Filter entry also stops PDFStream compressing again.
+        stream = pdfdoc.PDFStream(content=self.streamContent)
+        dictionary = stream.dictionary
+        dictionary["Type"] = pdfdoc.PDFName("XObject")
+        dictionary["Subtype"] = pdfdoc.PDFName("Image")
+        dictionary["Width"] = self.width
+        dictionary["Height"] = self.height
+        dictionary["BitsPerComponent"] = self.bitsPerComponent
+        dictionary["ColorSpace"] = pdfdoc.PDFName(self.colorSpace)
+        dictionary["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName("FlateDecode")])
+        dictionary["DecodeParms"] = pdfdoc.PDFArray([pdfdoc.PDFDictionary({
+            "Predictor": 15,
+            "Colors": self.colors,
+            "BitsPerComponent": self.bitsPerComponent,
+            "Columns": self.width,
+        })])
+        return stream.format(document)
+
+def _read_png_for_embedding(data: bytes) -> Optional[_PNGImageXObject]:
+    """Parse a non-interlaced 1/8-bit gray or 8-bit RGB PNG into a pass-through XObject"""
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b'IHDR':
+        return None
+    
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data[16:29])
+    if interlace != 0 or color_type not in _PNG_COLOR_TYPES:
+        return None
+    color_space, colors, bit_depths = _PNG_COLOR_TYPES[color_type]
+    if bit_depth not in bit_depths:
+        return None
+    
+    # Collect IDAT chunks; transparency or palettes need the decoding path
+    idat = []
+    offset = 8
+    while offset + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+        if chunk_type == b'IDAT':
+            idat.append(data[offset + 8:offset + 8 + length])
+        elif chunk_type in (b'tRNS', b'PLTE'):
+            return None
+        elif chunk_type == b'IEND':
+            break
+        offset += 12 + length
+    
+    if not idat:
+        return None
+    
+    return _PNGImageXObject('', width, height, color_space, colors, b''.join(idat), bit_depth)
+
+def _embed_direct(c: canvas.Canvas, image_path: Path, x: float, y: float,
+                  width: float, height: float) -> bool:
+    """Draw a compatible PNG without re-encoding it; False if unsupported"""
+    # Named by content, so identical images share one XObject and names
+    # do not depend on where temporary copies were written
+    data = image_path.read_bytes()
+    name = 'PNG' + hashlib.md5(data).hexdigest()
+    
+    # Same registration as Canvas.drawImage, so each image is embedded once
+    reg_name = c._doc.getXObjectName(name)
+    if not c._doc.idToObject.get(reg_name):
+        image_obj = _read_png_for_embedding(data)
+        if image_obj is None:
+            return False
+        image_obj.name = name
+        c._setXObjects(image_obj)
+        c._doc.Reference(image_obj, reg_name)
+        c._doc.addForm(name, image_obj)
+    
+    # Image XObjects occupy the unit square; scale it into place
+    c.saveState()
+    c.translate(x, y)
+    c.scale(width, height)
+    c.doForm(name)
+    c.restoreState()
+    return True
+
+def _reduce_colors(img: Image.Image) -> Optional[Image.Image]:
+    """Get a bilevel or grayscale copy of black-and-white art, or None"""
+    if img.mode == 'P':
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    if img.mode == 'RGBA':
+        # Transparent pixels have no defined color to keep
+        if img.getchannel('A').getextrema()[0] < 255:
+            return None
+        img = img.convert('RGB')
+    
+    if img.mode == 'RGB':
+        pixels = np.asarray(img)
+        if int((pixels.max(axis=2) - pixels.min(axis=2)).max()) >= 4:
+            return None
+        img = img.convert('L')
+    elif img.mode != 'L':
+        return None
+    
+    # Pure black and white line art needs one bit per pixel
+    colors = img.getcolors(2)
+    if colors and all(value in (0, 255) for _, value in colors):
+        return img.convert('1', dither=Image.Dither.NONE)
+    return img
+
+class _LevelZCompress(pdfdoc.PDFStreamFilterZCompress):
+    """Flate filter with a configurable zlib level"""
+    
+    def __init__(self, level: int):
+        self.level = level
+    
+    def encode(self, text):
+        if isinstance(text, str):
+            text = text.encode('utf8')
+        return zlib.compress(text, self.level)
+
+def _compress_pages(c: canvas.Canvas, level: int):
+    """Flate-compress the canvas's page content streams at the given level"""
+    flate = _LevelZCompress(level)
+    filters = [pdfdoc.PDFBase85Encode, flate] if rl_config.useA85 else [flate]
+    for page in c._doc.Pages.pages:
+        # Pages with Contents set are left to ReportLab's default filter
+        if page.stream and not page.Contents:
+            page.Contents = pdfdoc.PDFStream(content=page.stream, filters=filters)
+            page.compression = 0
+
 class PDFGenerator:
     """Generate print-ready PDF coloring books"""
     
-    def __init__(self):
+    def __init__(self, now: Optional[datetime] = None, cache_dir: Optional[Path] = None):
         self.logger = logging.getLogger(__name__)
         
+        # Fixed build time for reproducible output; None uses the clock
+        self.now = now
+        
         # Page dimensions
         self.page_width, self.page_height = A4
         self.margin = 15 * mm  # 15mm margins as per guide
@@ -29,248 +196,301 @@ class PDFGenerator:
         self.content_width = self.page_width - 2 * self.margin
         self.content_height = self.page_height - 2 * self.margin
         
-        # Styles
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        
-        # Title style
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Title'],
-            fontSize=24,
-            spaceAfter=20,
-            alignment=1,  # Center
-            textColor=colors.black
-        )
-        
-        # Subtitle style
-        self.subtitle_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=self.styles['Normal'],
-            fontSize=14,
-            spaceAfter=10,
-            alignment=1,  # Center
-            textColor=colors.grey
-        )
-        
-        # Footer style
-        self.footer_style = ParagraphStyle(
-            'CustomFooter',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            alignment=1,  # Center
-            textColor=colors.grey
-        )
+        # Page images larger than needed at this resolution are downscaled
+        self.target_dpi = 300
+        self._downscale_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._downscale_lock = threading.Lock()
+        
+        # Image pixel sizes keyed by (path, mtime, file size)
+        self._size_cache: Dict[tuple, Tuple[int, int]] = {}
+        
+        # One ImageReader per image for the current build, so an image drawn
+        # on several pages is decoded and embedded once
+        self._image_readers: Dict[Path, ImageReader] = {}
+        
+        # Digests of page images used more than once in the current build,
+        # and the forms drawn for them; False marks a failed drawing
+        self._shared_pages: set = set()
+        self._page_forms: Dict[str, bool] = {}
+        
+        # zlib level for re-encoded page images in the current build
+        self._compress_level = COMPRESSION_PROFILES['balanced']
+        
+        # Set when the current build drew a placeholder, lost its cover or
+        # skipped missing images; such builds are not cached
+        self._build_degraded = False
+        
+        # Finished PDFs keyed by a hash of their inputs, kept in the app's
+        # own directory rather than the shared system temp folder
+        self._pdf_cache_dir = cache_dir or Path.home() / "ColoringBookGenerator" / "Temp" / "pdf_cache"
+
     
     def create_coloring_book(self, images: List[Path], metadata: Dict[str, Any], 
-                           output_path: Path) -> Path:
+                           output_path: Path, compression_profile: str = 'balanced') -> Path:
         """Create complete coloring book PDF"""
         
-        # Create document
-        doc = SimpleDocTemplate(
-            str(output_path),
-            pagesize=A4,
-            rightMargin=self.margin,
-            leftMargin=self.margin,
-            topMargin=self.margin,
-            bottomMargin=self.margin,
-            title=metadata.get('title', 'Coloring Book'),
-            author=metadata.get('company', '3D Gravity Kids'),
-            subject="Children's Coloring Book",
-            keywords=f"coloring, children, {metadata.get('theme', 'adventure')}"
-        )
-        
-        # Build story
-        story = []
-        
-        # Add title page
-        story.extend(self._create_title_page(metadata))
-        
-        # Add coloring pages
-        for i, image_path in enumerate(images):
-            if image_path.exists():
-                story.extend(self._create_coloring_page(image_path, i + 1))
-            else:
-                self.logger.warning(f"Image not found: {image_path}")
-        
-        # Add back cover/credits page
-        story.extend(self._create_credits_page(metadata))
-        
-        # Build PDF
+        # One centered image per page needs no flowable layout, so the book
+        # is drawn directly on the canvas
         try:
-            doc.build(story)
+            self.create_print_ready_pdf(images, metadata, output_path, include_crop_marks=False,
+                                        compression_profile=compression_profile)
             self.logger.info(f"PDF created successfully: {output_path}")
             return output_path
         except Exception as e:
             self.logger.error(f"Failed to create PDF: {e}")
             raise
     
-    def _create_title_page(self, metadata: Dict[str, Any]) -> List:
-        """Create title page elements"""
-        story = []
-        
-        # Title
-        title = metadata.get('title', 'My Coloring Book')
-        story.append(Spacer(1, 50))
-        story.append(Paragraph(title, self.title_style))
-        story.append(Spacer(1, 20))
-        
-        # Subtitle
-        character_name = metadata.get('character_name', '')
-        if character_name:
-            subtitle = f"Adventures with {character_name}"
-            story.append(Paragraph(subtitle, self.subtitle_style))
-            story.append(Spacer(1, 30))
-        
-        # Age range
-        age_range = metadata.get('age_range', '')
-        if age_range:
-            story.append(Paragraph(f"Perfect for ages {age_range}", self.subtitle_style))
-            story.append(Spacer(1, 40))
-        
-        # Add cover image if available
-        cover_image = self._find_cover_image(metadata.get('images', []))
-        if cover_image and cover_image.exists():
-            story.append(self._create_image_element(cover_image, fit_to_page=False))
-        
-        story.append(Spacer(1, 50))
-        
-        # Footer branding
-        branding = f"{metadata.get('company', '3D Gravity Kids')} · {metadata.get('subtitle', 'Kopshti Magjik')}"
-        story.append(Paragraph(branding, self.footer_style))
-        
-        return story
+    def _get_image_size(self, image_path: Path) -> Tuple[int, int]:
+        """Get image pixel size, reading the file header only once per version"""
+        stat = image_path.stat()
+        key = (str(image_path), stat.st_mtime_ns, stat.st_size)
+        
+        size = self._size_cache.get(key)
+        if size is None:
+            # Image.open only parses the header; pixels are never decoded here
+            with Image.open(image_path) as img:
+                size = img.size
+            self._size_cache[key] = size
+        return size
     
-    def _create_coloring_page(self, image_path: Path, page_number: int) -> List:
-        """Create a single coloring page"""
-        story = []
-        
-        # Add page break
-        if page_number > 1:
-            story.append(Spacer(1, self.page_height))  # Page break
-        
-        # Add image
-        story.append(self._create_image_element(image_path, fit_to_page=True))
-        
-        return story
+    def _optimize_page_image(self, image_path: Path, display_width: float,
+                             display_height: float) -> Path:
+        """Get a copy of the image at target_dpi and in the fewest colors it needs"""
+        needed_width = math.ceil(display_width / inch * self.target_dpi)
+        needed_height = math.ceil(display_height / inch * self.target_dpi)
+        
+        img_width, _ = self._get_image_size(image_path)
+        downscale = img_width > needed_width * 1.05
+        
+        # Optimized copies are keyed by source version and target size, so
+        # they are reused across pages and builds
+        with self._downscale_lock:
+            if self._downscale_dir is None:
+                self._downscale_dir = tempfile.TemporaryDirectory(prefix="coloring_pdf_")
+        stat = image_path.stat()
+        key = hashlib.md5(
+            f"{image_path.resolve()}|{stat.st_mtime_ns}|{needed_width}x{needed_height}"
+            f"|{self._compress_level}".encode()
+        ).hexdigest()
+        optimized_path = Path(self._downscale_dir.name) / f"{key}.png"
+        if optimized_path.exists():
+            return optimized_path
+        
+        with Image.open(image_path) as img:
+            if not downscale and img.mode == '1':
+                return image_path
+            if downscale:
+                if img.mode not in ('1', 'L', 'RGB', 'RGBA'):
+                    img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+                img = img.convert('L') if img.mode == '1' else img
+                img.thumbnail((needed_width, needed_height), Image.Resampling.LANCZOS)
+            
+            # Line art stored as RGB embeds as gray or 1-bit, a third to a
+            # twenty-fourth of the pixel data
+            reduced = _reduce_colors(img)
+            if not downscale and (reduced is None or reduced is img):
+                return image_path
+            # Save under a temporary name so a crashed or concurrent write is
+            # never mistaken for a finished copy
+            temp_path = optimized_path.with_name(f"{key}.{threading.get_ident()}.tmp")
+            try:
+                (reduced or img).save(temp_path, format='PNG', optimize=False,
+                                      compress_level=self._compress_level)
+                os.replace(temp_path, optimized_path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+        
+        return optimized_path
     
-    def _create_credits_page(self, metadata: Dict[str, Any]) -> List:
-        """Create credits/back cover page"""
-        story = []
-        
-        # Page break
-        story.append(Spacer(1, self.page_height))
-        
-        story.append(Spacer(1, 100))
-        
-        # Thank you message
-        thank_you = "Thank you for choosing our coloring book!"
-        story.append(Paragraph(thank_you, self.title_style))
-        story.append(Spacer(1, 30))
-        
-        # Credits
-        credits_text = f"""
-        <para alignment="center">
-        Created with love by<br/>
-        <b>{metadata.get('company', '3D Gravity Kids')}</b><br/>
-        {metadata.get('subtitle', 'Kopshti Magjik')}<br/><br/>
-        
-        Visit us at: {metadata.get('website', 'kopshtimagjik.com')}<br/><br/>
-        
-        Generated on: {datetime.now().strftime('%B %Y')}<br/>
-        </para>
-        """
-        
-        story.append(Paragraph(credits_text, self.styles['Normal']))
-        story.append(Spacer(1, 50))
-        
-        # Copyright notice
-        copyright_text = f"© {datetime.now().year} {metadata.get('company', '3D Gravity Kids')}. All rights reserved."
-        story.append(Paragraph(copyright_text, self.footer_style))
-        
-        return story
+    def _get_reader(self, image_path: Path) -> ImageReader:
+        """Get the shared ImageReader for an image in the current build"""
+        key = image_path.resolve()
+        reader = self._image_readers.get(key)
+        if reader is None:
+            reader = ImageReader(str(key))
+            self._image_readers[key] = reader
+        return reader
     
-    def _create_image_element(self, image_path: Path, fit_to_page: bool = True) -> ReportLabImage:
-        """Create a ReportLab image element"""
-        
-        try:
-            # Open image to get dimensions
-            with Image.open(image_path) as img:
-                img_width, img_height = img.size
-            
-            # Calculate scaling for fit-to-page
-            if fit_to_page:
-                # Scale to fit content area while maintaining aspect ratio
-                width_scale = self.content_width / img_width
-                height_scale = self.content_height / img_height
-                scale = min(width_scale, height_scale)
-                
-                display_width = img_width * scale
-                display_height = img_height * scale
-            else:
-                # Use smaller size for cover images
-                max_size = min(self.content_width, self.content_height) * 0.7
-                width_scale = max_size / img_width
-                height_scale = max_size / img_height
-                scale = min(width_scale, height_scale)
-                
-                display_width = img_width * scale
-                display_height = img_height * scale
-            
-            # Create ReportLab image
-            return ReportLabImage(
-                str(image_path),
-                width=display_width,
-                height=display_height
-            )
-            
-        except Exception as e:
-            self.logger.error(f"Failed to create image element for {image_path}: {e}")
-            # Return placeholder
-            return Paragraph(f"[Image: {image_path.name}]", self.styles['Normal'])
+    def _partition_existing(self, images: List[Path]) -> Tuple[List[Path], List[Path]]:
+        """Split images into existing and missing with one directory listing per folder"""
+        listings: Dict[Path, set] = {}
+        existing, missing = [], []
+        for image_path in images:
+            parent = image_path.parent
+            names = listings.get(parent)
+            if names is None:
+                try:
+                    with os.scandir(parent) as entries:
+                        names = {entry.name for entry in entries}
+                except OSError:
+                    names = set()
+                listings[parent] = names
+            (existing if image_path.name in names else missing).append(image_path)
+        return existing, missing
     
     def _find_cover_image(self, images: List[Path]) -> Optional[Path]:
         """Find cover image from image list"""
         for image_path in images:
-            if 'cover' in image_path.name.lower():
+            if _COVER_RE.search(image_path.name):
                 return image_path
         return None
     
+    def _pdf_cache_key(self, images: List[Path], metadata: Dict[str, Any],
+                       include_crop_marks: bool, compression_profile: str,
+                       build_now: datetime) -> str:
+        """Hash everything that affects the content of a built PDF"""
+        key = hashlib.blake2b(digest_size=16)
+        key.update(PDF_CACHE_VERSION.encode())
+        
+        # Source files by version; the cover may only be listed in metadata
+        for image_path in dict.fromkeys(list(images) + list(metadata.get('images', []))):
+            try:
+                stat = os.stat(image_path)
+                key.update(f"{image_path}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+            except OSError:
+                key.update(f"{image_path}|missing\n".encode())
+        
+        key.update(json.dumps(metadata, sort_keys=True, default=str).encode())
+        # The credits page shows the build month
+        settings = (include_crop_marks, compression_profile, self.page_width, self.page_height,
+                    self.margin, self.target_dpi, build_now.strftime('%Y-%m'),
+                    build_now.isoformat() if self.now else None)
+        key.update(repr(settings).encode())
+        return key.hexdigest()
+    
+    def _copy_cached_pdf(self, source: Path, destination: Path):
+        """Copy a PDF into or out of the cache"""
+        # A hard link would let edits to the output rewrite the cached PDF
+        shutil.copyfile(source, destination)
+    
+    def _publish_cached_pdf(self, output_path: Path, cached_path: Path):
+        """Store a finished PDF in the cache, then prune old entries"""
+        try:
+            self._pdf_cache_dir.mkdir(parents=True, exist_ok=True)
+            staging_path = cached_path.with_suffix(f'.{os.getpid()}.tmp')
+            self._copy_cached_pdf(output_path, staging_path)
+            os.replace(staging_path, cached_path)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache PDF {output_path}: {e}")
+        else:
+            self._prune_pdf_cache()
+    
+    def _prune_pdf_cache(self):
+        """Evict expired cached PDFs, then the oldest until under the size cap"""
+        try:
+            entries = []
+            with os.scandir(self._pdf_cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.pdf') and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            self.logger.warning(f"Failed to scan PDF cache {self._pdf_cache_dir}: {e}")
+            return
+        
+        # Reused entries are touched, so mtime orders by last use
+        entries.sort()
+        expiry = datetime.now().timestamp() - PDF_CACHE_MAX_AGE_DAYS * 86400
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in entries:
+            if mtime >= expiry and total <= PDF_CACHE_MAX_BYTES:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError as e:
+                self.logger.warning(f"Failed to evict cached PDF {path}: {e}")
+    
     def create_print_ready_pdf(self, images: List[Path], metadata: Dict[str, Any], 
-                              output_path: Path, include_crop_marks: bool = False) -> Path:
+                              output_path: Path, include_crop_marks: bool = False,
+                              compression_profile: str = 'balanced') -> Path:
         """Create print-ready PDF with professional settings"""
         
-        # Create custom canvas for more control
-        c = canvas.Canvas(str(output_path), pagesize=A4)
-        
-        # Set PDF metadata
-        c.setTitle(metadata.get('title', 'Coloring Book'))
-        c.setAuthor(metadata.get('company', '3D Gravity Kids'))
-        c.setSubject("Children's Coloring Book")
-        c.setCreator("Coloring Book Generator")
-        
-        page_num = 1
-        
-        # Title page
-        self._draw_title_page_canvas(c, metadata)
-        c.showPage()
-        page_num += 1
-        
-        # Content pages
-        for image_path in images:
-            if image_path.exists():
-                self._draw_image_page_canvas(c, image_path, include_crop_marks)
+        if compression_profile not in COMPRESSION_PROFILES:
+            raise ValueError(f"Unknown compression profile: {compression_profile}")
+        self._compress_level = COMPRESSION_PROFILES[compression_profile]
+        build_now = self.now or datetime.now()
+        
+        # Rebuilding unchanged inputs reuses the earlier PDF
+        cached_path = self._pdf_cache_dir / (self._pdf_cache_key(
+            images, metadata, include_crop_marks, compression_profile, build_now) + '.pdf')
+        if cached_path.exists():
+            try:
+                os.utime(cached_path)
+                self._copy_cached_pdf(cached_path, output_path)
+                self.logger.info(f"Print-ready PDF reused from cache: {output_path}")
+                return output_path
+            except OSError as e:
+                self.logger.warning(f"Failed to reuse cached PDF {cached_path}: {e}")
+        
+        self._build_degraded = False
+        
+        # Create custom canvas for more control, writing through a 1 MiB
+        # buffer with compressed page content streams
+        pdf_file = open(output_path, 'wb', buffering=1024 * 1024)
+        try:
+            # A pinned build time also makes ReportLab's IDs and dates invariant
+            c = canvas.Canvas(pdf_file, pagesize=A4, pageCompression=1,
+                              invariant=1 if self.now else None)
+            
+            # Set PDF metadata
+            c.setTitle(metadata.get('title', 'Coloring Book'))
+            c.setAuthor(metadata.get('company', '3D Gravity Kids'))
+            c.setSubject("Children's Coloring Book")
+            c.setKeywords(f"coloring, children, {metadata.get('theme', 'adventure')}")
+            c.setCreator("Coloring Book Generator")
+            
+            # Crop marks are identical on every page, so they are defined
+            # once as a form and referenced per page
+            if include_crop_marks:
+                c.beginForm(CROP_MARKS_FORM)
+                self._draw_crop_marks(c)
+                c.endForm()
+            
+            page_num = 1
+            
+            # Title page
+            self._draw_title_page_canvas(c, metadata)
+            c.showPage()
+            page_num += 1
+            
+            existing_images, missing_images = self._partition_existing(images)
+            for image_path in missing_images:
+                self.logger.warning(f"Image not found: {image_path}")
+                self._build_degraded = True
+            
+            # Size and downscale all pages up front; drawing stays sequential
+            prepared_pages = self._prepare_pages(existing_images)
+            digests = Counter(prepared_pages[p][3] for p in existing_images
+                              if not isinstance(prepared_pages[p], Exception))
+            self._shared_pages = {digest for digest, count in digests.items() if count > 1}
+            
+            # Content pages
+            for image_path in existing_images:
+                self._draw_image_page_canvas(c, image_path, include_crop_marks,
+                                             prepared_pages.get(image_path))
                 c.showPage()
                 page_num += 1
-        
-        # Credits page
-        self._draw_credits_page_canvas(c, metadata)
-        
-        # Save PDF
-        c.save()
+            
+            # Credits page
+            self._draw_credits_page_canvas(c, metadata, build_now)
+            
+            # Save PDF
+            _compress_pages(c, self._compress_level)
+            c.save()
+        finally:
+            pdf_file.close()
+            # Readers hold decoded pixels; only keep them for one build
+            self._image_readers.clear()
+            self._shared_pages.clear()
+            self._page_forms.clear()
+        
+        # Publish to the cache atomically so readers never see partial files;
+        # a degraded build is retried in full next time
+        if self._build_degraded:
+            self.logger.warning(f"PDF built with errors, not caching: {output_path}")
+        else:
+            self._publish_cached_pdf(output_path, cached_path)
         
         self.logger.info(f"Print-ready PDF created: {output_path}")
         return output_path
@@ -281,7 +501,7 @@ class PDFGenerator:
         # Title
         c.setFont("Helvetica-Bold", 24)
         title = metadata.get('title', 'My Coloring Book')
-        title_width = c.stringWidth(title, "Helvetica-Bold", 24)
+        title_width = stringWidth(title, "Helvetica-Bold", 24)
         c.drawString((self.page_width - title_width) / 2, self.page_height - 100, title)
         
         # Subtitle
@@ -289,66 +509,155 @@ class PDFGenerator:
         character_name = metadata.get('character_name', '')
         if character_name:
             subtitle = f"Adventures with {character_name}"
-            subtitle_width = c.stringWidth(subtitle, "Helvetica", 14)
+            subtitle_width = stringWidth(subtitle, "Helvetica", 14)
             c.drawString((self.page_width - subtitle_width) / 2, self.page_height - 130, subtitle)
         
         # Age range
         age_range = metadata.get('age_range', '')
         if age_range:
             age_text = f"Perfect for ages {age_range}"
-            age_width = c.stringWidth(age_text, "Helvetica", 14)
+            age_width = stringWidth(age_text, "Helvetica", 14)
             c.drawString((self.page_width - age_width) / 2, self.page_height - 160, age_text)
         
+        # Cover image if available
+        cover_image = self._find_cover_image(metadata.get('images', []))
+        if cover_image and cover_image.exists():
+            self._draw_cover_image_canvas(c, cover_image)
+        
         # Footer branding
         c.setFont("Helvetica", 10)
         branding = f"{metadata.get('company', '3D Gravity Kids')} · {metadata.get('subtitle', 'Kopshti Magjik')}"
-        brand_width = c.stringWidth(branding, "Helvetica", 10)
+        brand_width = stringWidth(branding, "Helvetica", 10)
         c.drawString((self.page_width - brand_width) / 2, 50, branding)
     
-    def _draw_image_page_canvas(self, c: canvas.Canvas, image_path: Path, 
-                               include_crop_marks: bool = False):
-        """Draw image page using canvas"""
+    def _draw_cover_image_canvas(self, c: canvas.Canvas, image_path: Path):
+        """Draw the cover image between the title block and the footer"""
         
         try:
-            # Open and get image dimensions
-            with Image.open(image_path) as img:
-                img_width, img_height = img.size
+            img_width, img_height = self._get_image_size(image_path)
             
-            # Calculate scaling to fit page with margins
-            available_width = self.content_width
-            available_height = self.content_height
-            
-            width_scale = available_width / img_width
-            height_scale = available_height / img_height
-            scale = min(width_scale, height_scale)
+            # Use smaller size for cover images
+            max_size = min(self.content_width, self.content_height) * 0.7
+            scale = min(max_size / img_width, max_size / img_height)
             
             display_width = img_width * scale
             display_height = img_height * scale
             
+            # Center horizontally and within the space left on the page
+            top = self.page_height - 190
+            bottom = 80
+            x = (self.page_width - display_width) / 2
+            y = bottom + (top - bottom - display_height) / 2
+            
+            self._draw_image(c, image_path, x, y, display_width, display_height)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to draw cover image {image_path}: {e}")
+            self._build_degraded = True
+    
+    def _draw_image(self, c: canvas.Canvas, image_path: Path, x: float, y: float,
+                    width: float, height: float):
+        """Draw an image, passing compatible PNG data through unchanged"""
+        if not _embed_direct(c, image_path, x, y, width, height):
+            c.drawImage(self._get_reader(image_path), x, y, width, height)
+    
+    def _prepare_page(self, image_path: Path) -> Tuple[Path, float, float, str]:
+        """Fit a page image to the content area, downscaling it if oversized"""
+        
+        # Cached image dimensions
+        img_width, img_height = self._get_image_size(image_path)
+        
+        # Calculate scaling to fit page with margins
+        width_scale = self.content_width / img_width
+        height_scale = self.content_height / img_height
+        scale = min(width_scale, height_scale)
+        
+        display_width = img_width * scale
+        display_height = img_height * scale
+        
+        # Page images only need enough pixels and colors for print
+        prepared_path = self._optimize_page_image(image_path, display_width, display_height)
+        
+        # Pages with identical image data share one drawing
+        digest = hashlib.blake2b(prepared_path.read_bytes(), digest_size=16).hexdigest()
+        
+        return prepared_path, display_width, display_height, digest
+    
+    def _prepare_pages(self, image_paths: List[Path]) -> Dict[Path, Union[Tuple[Path, float, float, str], Exception]]:
+        """Prepare each distinct page image in parallel, keyed by source path"""
+        
+        unique_paths = list(dict.fromkeys(image_paths))
+        prepared = {}
+        if not unique_paths:
+            return prepared
+        
+        # PIL decoding and resampling release the GIL, so threads scale here
+        # without forking worker processes from the GUI
+        max_workers = min(len(unique_paths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {path: executor.submit(self._prepare_page, path) for path in unique_paths}
+        
+        for path, future in futures.items():
+            try:
+                prepared[path] = future.result()
+            except Exception as e:
+                # Reported when the page is drawn
+                prepared[path] = e
+        
+        return prepared
+    
+    def _draw_image_page_canvas(self, c: canvas.Canvas, image_path: Path, 
+                               include_crop_marks: bool = False,
+                               prepared: Union[Tuple[Path, float, float, str], Exception, None] = None):
+        """Draw image page using canvas"""
+        
+        try:
+            if isinstance(prepared, Exception):
+                raise prepared
+            prepared_path, display_width, display_height, digest = (
+                prepared or self._prepare_page(image_path))
+            
             # Center image on page
             x = (self.page_width - display_width) / 2
             y = (self.page_height - display_height) / 2
             
-            # Draw image
-            c.drawImage(str(image_path), x, y, display_width, display_height)
+            # Images repeated across pages are drawn once into a form that
+            # later pages only reference
+            if digest not in self._shared_pages:
+                self._draw_image(c, prepared_path, x, y, display_width, display_height)
+            else:
+                form_name = f"Page{digest}"
+                if form_name not in self._page_forms:
+                    self._page_forms[form_name] = False
+                    c.beginForm(form_name)
+                    try:
+                        self._draw_image(c, prepared_path, x, y, display_width, display_height)
+                    finally:
+                        c.endForm()
+                    self._page_forms[form_name] = True
+                elif not self._page_forms[form_name]:
+                    raise ValueError(f"Image could not be drawn: {prepared_path}")
+                c.doForm(form_name)
             
             # Add crop marks if requested
             if include_crop_marks:
-                self._draw_crop_marks(c)
+                c.doForm(CROP_MARKS_FORM)
                 
         except Exception as e:
             self.logger.error(f"Failed to draw image {image_path}: {e}")
+            self._build_degraded = True
             # Draw placeholder text
             c.setFont("Helvetica", 12)
             c.drawString(100, self.page_height / 2, f"Error loading image: {image_path.name}")
     
-    def _draw_credits_page_canvas(self, c: canvas.Canvas, metadata: Dict[str, Any]):
+    def _draw_credits_page_canvas(self, c: canvas.Canvas, metadata: Dict[str, Any],
+                                  now: datetime):
         """Draw credits page using canvas"""
         
         # Thank you message
         c.setFont("Helvetica-Bold", 18)
         thank_you = "Thank you for choosing our coloring book!"
-        thank_width = c.stringWidth(thank_you, "Helvetica-Bold", 18)
+        thank_width = stringWidth(thank_you, "Helvetica-Bold", 18)
         c.drawString((self.page_width - thank_width) / 2, self.page_height - 150, thank_you)
         
         # Credits
@@ -360,20 +669,20 @@ class PDFGenerator:
             "",
             f"Visit us at: {metadata.get('website', 'kopshtimagjik.com')}",
             "",
-            f"Generated on: {datetime.now().strftime('%B %Y')}"
+            f"Generated on: {now.strftime('%B %Y')}"
         ]
         
-        y_pos = self.page_height - 200
-        for line in credits_lines:
-            if line:  # Skip empty lines for spacing
-                line_width = c.stringWidth(line, "Helvetica", 12)
-                c.drawString((self.page_width - line_width) / 2, y_pos, line)
-            y_pos -= 20
+        # Measure all lines in one pass; empty lines only add spacing
+        top = self.page_height - 200
+        measured_lines = [(top - 20 * i, line, stringWidth(line, "Helvetica", 12))
+                          for i, line in enumerate(credits_lines) if line]
+        for y_pos, line, line_width in measured_lines:
+            c.drawString((self.page_width - line_width) / 2, y_pos, line)
         
         # Copyright notice
         c.setFont("Helvetica", 8)
-        copyright_text = f"© {datetime.now().year} {metadata.get('company', '3D Gravity Kids')}. All rights reserved."
-        copyright_width = c.stringWidth(copyright_text, "Helvetica", 8)
+        copyright_text = f"© {now.year} {metadata.get('company', '3D Gravity Kids')}. All rights reserved."
+        copyright_width = stringWidth(copyright_text, "Helvetica", 8)
         c.drawString((self.page_width - copyright_width) / 2, 50, copyright_text)
     
     def _draw_crop_marks(self, c: canvas.Canvas):
@@ -382,23 +691,24 @@ class PDFGenerator:
         mark_length = 10
         mark_offset = 5
         
-        # Top left
-        c.line(0, self.page_height - mark_offset, mark_length, self.page_height - mark_offset)
-        c.line(mark_offset, self.page_height, mark_offset, self.page_height - mark_length)
-        
-        # Top right
-        c.line(self.page_width - mark_length, self.page_height - mark_offset, 
-               self.page_width, self.page_height - mark_offset)
-        c.line(self.page_width - mark_offset, self.page_height, 
-               self.page_width - mark_offset, self.page_height - mark_length)
-        
-        # Bottom left
-        c.line(0, mark_offset, mark_length, mark_offset)
-        c.line(mark_offset, 0, mark_offset, mark_length)
-        
-        # Bottom right
-        c.line(self.page_width - mark_length, mark_offset, self.page_width, mark_offset)
-        c.line(self.page_width - mark_offset, 0, self.page_width - mark_offset, mark_length)
+        top = self.page_height
+        right = self.page_width
+        
+        # All eight segments go out as one path
+        c.lines([
+            # Top left
+            (0, top - mark_offset, mark_length, top - mark_offset),
+            (mark_offset, top, mark_offset, top - mark_length),
+            # Top right
+            (right - mark_length, top - mark_offset, right, top - mark_offset),
+            (right - mark_offset, top, right - mark_offset, top - mark_length),
+            # Bottom left
+            (0, mark_offset, mark_length, mark_offset),
+            (mark_offset, 0, mark_offset, mark_length),
+            # Bottom right
+            (right - mark_length, mark_offset, right, mark_offset),
+            (right - mark_offset, 0, right - mark_offset, mark_length),
+        ])
     
     def create_us_letter_version(self, a4_pdf_path: Path, output_path: Path) -> Path:
         """Create US Letter version from A4 PDF for Amazon KDP"""
@@ -414,8 +724,14 @@ class PDFGenerator:
     def validate_pdf_for_printing(self, pdf_path: Path) -> Dict[str, Any]:
         """Validate PDF meets printing requirements"""
         
+        # A single stat answers both existence and size
+        try:
+            file_size = os.stat(pdf_path).st_size
+        except FileNotFoundError:
+            file_size = None
+        
         validation_results = {
-            'file_exists': pdf_path.exists(),
+            'file_exists': file_size is not None,
             'file_size_mb': 0,
             'page_count': 0,
             'color_profile': 'unknown',
@@ -424,8 +740,8 @@ class PDFGenerator:
             'issues': []
         }
         
-        if pdf_path.exists():
-            validation_results['file_size_mb'] = pdf_path.stat().st_size / (1024 * 1024)
+        if file_size is not None:
+            validation_results['file_size_mb'] = file_size / (1024 * 1024)
             
             # Additional validation would require PDF analysis libraries
             # For now, assume basic validation